@@ -5,88 +5,389 @@ Allows you to increase or decrease positions by a specified percentage
 """
 
 import os
+import re
 import sys
 import time
 import getpass
+import functools
+import pickle
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
 from typing import Dict, List, Tuple, Optional
-from decimal import Decimal, ROUND_DOWN
-from colorama import init, Fore, Style
 import robin_stocks.robinhood as rs
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from dotenv import load_dotenv
 import pyotp
 import click
 
-# Initialize colorama for colored output
-init(autoreset=True)
+# Importing readline gives input() line editing and history where available
+try:
+    import readline
+    readline.set_history_length(50)
+except ImportError:
+    readline = None
+
+# SGR color sequences produced by click.style
+ANSI_SGR_RE = re.compile(r'\x1b\[[0-9;]*m')
+
+# Prebuilt colored pieces for the per-position display loop. The C_* prefixes
+# leave their color open for the rest of the line, which must end with RESET.
+RESET = click.style('', reset=True)
+SEP = click.style('-' * 60, fg='cyan') + '\n'
+C_OK = click.style('✓ ', fg='green', reset=False)
+C_ERR = click.style('✗ ', fg='red', reset=False)
+C_BUY = '  ' + click.style('→ BUY ', fg='green', reset=False)
+C_SELL = '  ' + click.style('→ SELL ', fg='red', reset=False)
+C_SKIP = click.style('Skipping ', fg='yellow', reset=False)
+C_ERR_PROCESSING = click.style('Error processing ', fg='red', reset=False)
+C_DRY_RUN_TRADE = click.style('DRY RUN: Would execute trade', fg='cyan')
+C_AUTO_CONFIRM = click.style('Auto-confirming trade...', fg='green')
+PROMPT_TRADE = '\n  ' + click.style("Press ENTER to execute, 'skip' to skip, or 'abort' to exit:", fg='yellow') + ' '
+
+# Interactive-mode prompts and errors; {action} placeholders are filled once per run
+PROMPT_CHOICE = click.style("\nEnter your choice (1-3): ", fg='yellow')
+ERR_INVALID_CHOICE = click.style("Invalid choice. Please enter 1, 2, or 3.", fg='red')
+PROMPT_PCT = click.style("\nEnter the percentage to {action} positions by: ", fg='yellow')
+ERR_PCT_RANGE = click.style("Please enter a percentage between 0 and 100", fg='red')
+ERR_BAD_NUMBER = click.style("Please enter a valid number", fg='red')
+PROMPT_CONFIRM = click.style("\nProceed with {action}ing positions? (yes/no): ", fg='yellow')
+
+# Operation summary templates with colors baked in, filled with str.format.
+# Dollar amounts are passed in already formatted by fmt_money.
+SUMMARY_TPL = (
+    "\n" + click.style("Operation Summary:", fg='white') + "\n"
+    "  Action: " + click.style("{action}", fg='cyan') +
+    " positions by " + click.style("{pct}%", fg='yellow') + "\n"
+)
+INCREASE_TPL = (
+    "  Expected Total Cost: " + click.style("{expected_cost}", fg='red') + "\n"
+    "  Available Cash: " + click.style("{available_cash}", fg='green') + "\n"
+)
+INCREASE_OK_TPL = "  Remaining Cash After: " + click.style("{remaining}", fg='green') + "\n"
+INSUFFICIENT_FUNDS_TPL = (
+    click.style("\n❌ ERROR: Insufficient funds!\n"
+                "You need {needed} but only have {available_cash} available.", fg='red') + "\n" +
+    click.style("Try a smaller percentage or sell some positions first.", fg='yellow') + "\n"
+)
+DECREASE_TPL = (
+    "  Expected Proceeds: " + click.style("{expected_cost}", fg='green') + "\n"
+    "  Cash After Selling: " + click.style("{remaining}", fg='green') + "\n"
+)
+
+# Number of concurrent per-symbol price requests when batching fails
+PRICE_FETCH_WORKERS = 16
+
+# Keep-alive connection pool size for the shared Robinhood HTTP session
+HTTP_POOL_SIZE = 16
+
+# Environment variables read during authentication
+CREDENTIAL_ENV_VARS = (
+    'ROBINHOOD_USERNAME',
+    'ROBINHOOD_PASSWORD',
+    'ROBINHOOD_TOTP_SECRET',
+    'ROBINHOOD_MFA_CODE',
+)
+
+# Substrings in login errors that signal a device challenge or a bad 2FA code
+DEVICE_TOKENS = ('challenge', 'device')
+MFA_TOKENS = ('mfa', 'code')
+
+# Number of orders placed concurrently in auto-confirm mode
+TRADE_WORKERS = 4
+
+# robin_stocks saves the session token to ~/.tokens/robinhood<pickle_name>.pickle
+TOKEN_PICKLE_NAME = 'robinhood'
+TOKEN_PATH = os.path.join(os.path.expanduser("~"), ".tokens",
+                          "robinhood" + TOKEN_PICKLE_NAME + ".pickle")
+
+# Parallel lists of (symbols, prices, shares_to_trade, costs) built by plan_trades
+TradePlan = Tuple[List[str], List[float], List[int], List[float]]
+
+# How long cached account data stays fresh before hitting the API again (seconds)
+CACHE_TTL = 30
+
+def _memoize_method(method):
+    """
+    Cache a no-argument method's result on the instance for CACHE_TTL seconds
+    
+    Calls that raise are not cached, so a transient API error is retried next time.
+    """
+    @functools.wraps(method)
+    def wrapper(self):
+        cached = self._cache.get(method.__name__)
+        if cached is not None and time.time() - cached[0] < CACHE_TTL:
+            return cached[1]
+        result = method(self)
+        self._cache[method.__name__] = (time.time(), result)
+        return result
+    return wrapper
+
+@functools.lru_cache(maxsize=1)
+def _load_env_once() -> Dict[str, Optional[str]]:
+    """
+    Load .env credentials once per process
+    
+    Returns:
+        Dict of CREDENTIAL_ENV_VARS to their values (None if unset)
+    """
+    # Try loading from current directory first
+    load_dotenv()
+
+    credentials = {}
+    if ((username := os.environ.get('ROBINHOOD_USERNAME')) and
+            (password := os.environ.get('ROBINHOOD_PASSWORD'))):
+        credentials['ROBINHOOD_USERNAME'] = username
+        credentials['ROBINHOOD_PASSWORD'] = password
+    else:
+        # If no credentials found, try ~/.config/rob/.env, then ~/.rob/.env as fallback.
+        # load_dotenv is a no-op returning False for missing files.
+        for env_path in (os.path.expanduser("~/.config/rob/.env"),
+                         os.path.expanduser("~/.rob/.env")):
+            try:
+                if load_dotenv(env_path):
+                    break
+            except PermissionError:
+                click.secho(f"Permission denied accessing {env_path}", fg='red')
+                click.secho("Try running with sudo: sudo rob", fg='yellow')
+                sys.exit(1)
+
+    for key in CREDENTIAL_ENV_VARS:
+        if key not in credentials:
+            credentials[key] = os.environ.get(key)
+    return credentials
+
+def fmt_money(cents: int) -> str:
+    """
+    Format an integer number of cents as dollars, e.g. 123456789 -> '$1,234,567.89'
+    
+    Digits are written right to left into a byte buffer with div/mod by 10,
+    avoiding the format mini-language.
+    """
+    negative = cents < 0
+    dollars, cents = divmod(-cents if negative else cents, 100)
+
+    # Room for every dollar digit plus a comma per three, '$', '-', '.' and cents
+    size = 2 * (dollars.bit_length() // 3 + 1) + 5
+    buf = bytearray(size)
+    pos = size
+
+    pos -= 3
+    buf[pos] = 0x2E  # '.'
+    buf[pos + 1] = 0x30 + cents // 10
+    buf[pos + 2] = 0x30 + cents % 10
+
+    group = 0
+    while True:
+        pos -= 1
+        buf[pos] = 0x30 + dollars % 10
+        dollars //= 10
+        if not dollars:
+            break
+        group += 1
+        if group == 3:
+            pos -= 1
+            buf[pos] = 0x2C  # ','
+            group = 0
+
+    if negative:
+        pos -= 1
+        buf[pos] = 0x2D  # '-'
+    pos -= 1
+    buf[pos] = 0x24  # '$'
+    return buf[pos:].decode('ascii')
+
+def to_cents(amount: float) -> int:
+    """
+    Convert a dollar amount to whole cents, rounding the way f"{amount:.2f}" does
+    
+    round(amount, 2) rounds on the exact decimal value; scaling first would
+    round the float product instead and can land a cent off (e.g. 7583.465).
+    """
+    return round(round(amount, 2) * 100)
+
+def parse_pct(text: str) -> float:
+    """
+    Parse a plain decimal percentage such as '5' or '2.5'
+    
+    Accepts digits with at most one decimal point. Signs, exponents, leading
+    zeros ('01') and bare points ('.5', '5.') are rejected.
+    
+    Raises:
+        ValueError: If the text is not a plain decimal number or is too large for a float
+    """
+    data = text.strip().encode('ascii')  # UnicodeEncodeError is a ValueError
+    if not data:
+        raise ValueError("empty percentage")
+    if len(data) > 1 and data[0] == 0x30 and data[1] != 0x2E:
+        raise ValueError(f"leading zero in percentage: {text!r}")
+
+    value = 0
+    int_digits = 0
+    frac_digits = 0
+    seen_point = False
+    for byte in data:
+        digit = byte - 0x30
+        if 0 <= digit <= 9:
+            value = value * 10 + digit
+            if seen_point:
+                frac_digits += 1
+            else:
+                int_digits += 1
+        elif byte == 0x2E and not seen_point:  # '.'
+            seen_point = True
+        else:
+            raise ValueError(f"invalid character in percentage: {text!r}")
+
+    if not int_digits or (seen_point and not frac_digits):
+        raise ValueError(f"incomplete number: {text!r}")
+    try:
+        return value / 10 ** frac_digits
+    except OverflowError:
+        raise ValueError(f"percentage out of range: {text!r}") from None
+
+def read_choice(valid: str) -> str:
+    """
+    Read a single menu keypress without waiting for ENTER
+    
+    Keys not in valid are ignored. When stdin is not a terminal, falls back to
+    reading a full line, which the caller must validate.
+    """
+    if not sys.stdin.isatty():
+        return input().strip()
+
+    if os.name == 'nt':
+        import msvcrt
+        while True:
+            ch = msvcrt.getwch()
+            if ch == '\x03':
+                raise KeyboardInterrupt
+            if ch in valid:
+                break
+    else:
+        import termios
+        import tty
+        fd = sys.stdin.fileno()
+        old_attrs = termios.tcgetattr(fd)
+        try:
+            # cbreak keeps Ctrl-C working while disabling line buffering
+            tty.setcbreak(fd)
+            while True:
+                ch = sys.stdin.read(1)
+                if not ch:
+                    raise EOFError
+                if ch in valid:
+                    break
+        finally:
+            termios.tcsetattr(fd, termios.TCSADRAIN, old_attrs)
+
+    click.echo(ch)
+    return ch
+
+def prompt_input(prompt: str) -> str:
+    """
+    Read a line with input(), passing it a click-styled prompt
+    
+    The prompt is handed to input() rather than echoed first, so readline
+    redraws it on history recall or line kills. Color codes are stripped the
+    same way click.echo would strip them, and otherwise wrapped in \\001/\\002
+    so readline leaves them out of the line width.
+    """
+    color = click.globals.resolve_color_default()
+    if not (sys.stdout.isatty() if color is None else color):
+        prompt = click.unstyle(prompt)
+    elif readline is not None:
+        prompt = ANSI_SGR_RE.sub('\001\\g<0>\002', prompt)
+    return input(prompt)
+
+def _format_operation_summary(action: str, percentage: float, expected_cost: float,
+                              available_cash: float) -> Tuple[str, bool]:
+    """
+    Render the operation summary shown before trading
+    
+    Returns:
+        Tuple of (summary_text, affordable)
+    """
+    expected_cents = to_cents(expected_cost)
+    cash_cents = to_cents(available_cash)
+    cost_str = fmt_money(expected_cents)
+    cash_str = fmt_money(cash_cents)
+
+    text = SUMMARY_TPL.format(action=action.upper(), pct=percentage)
+    if action == 'increase':
+        text += INCREASE_TPL.format(expected_cost=cost_str, available_cash=cash_str)
+        # Check if user has enough cash
+        if expected_cost > available_cash:
+            return text + INSUFFICIENT_FUNDS_TPL.format(
+                needed=cost_str, available_cash=cash_str), False
+        return text + INCREASE_OK_TPL.format(remaining=fmt_money(cash_cents - expected_cents)), True
+    return text + DECREASE_TPL.format(expected_cost=cost_str,
+                                      remaining=fmt_money(cash_cents + expected_cents)), True
 
 class RobinhoodPositionManager:
-    def __init__(self):
-        """Initialize the position manager"""
-        self.load_credentials()
+    def __init__(self, trade_delay: float = 0.0):
+        """
+        Initialize the position manager
+        
+        Args:
+            trade_delay: Seconds to wait after each successful trade
+        """
+        self.trade_delay = trade_delay
+        self._env = self.load_credentials()
+        totp_secret = self._env['ROBINHOOD_TOTP_SECRET']  # The secret key for TOTP generation
+        self._totp = pyotp.TOTP(totp_secret) if totp_secret else None
         self.authenticated = False
+        self._cache = {}
+        self._session = None
 
-    def load_credentials(self):
+    def load_credentials(self) -> Dict[str, Optional[str]]:
         """Load credentials from multiple possible locations"""
-        # Try loading from current directory first
-        load_dotenv()
-
-        # If no credentials found, try user config directory
-        if not (os.getenv('ROBINHOOD_USERNAME') and os.getenv('ROBINHOOD_PASSWORD')):
-            # Try ~/.config/rob/.env
-            config_dir = os.path.expanduser("~/.config/rob")
-            config_env = os.path.join(config_dir, ".env")
-            if os.path.exists(config_env):
-                try:
-                    load_dotenv(config_env)
-                except PermissionError:
-                    print(f"{Fore.RED}Permission denied accessing {config_env}{Style.RESET_ALL}")
-                    print(f"{Fore.YELLOW}Try running with sudo: sudo rob{Style.RESET_ALL}")
-                    sys.exit(1)
-
-            # Try ~/.rob/.env as fallback
-            elif os.path.exists(os.path.expanduser("~/.rob/.env")):
-                try:
-                    load_dotenv(os.path.expanduser("~/.rob/.env"))
-                except PermissionError:
-                    rob_env = os.path.expanduser("~/.rob/.env")
-                    print(f"{Fore.RED}Permission denied accessing {rob_env}{Style.RESET_ALL}")
-                    print(f"{Fore.YELLOW}Try running with sudo: sudo rob{Style.RESET_ALL}")
-                    sys.exit(1)
+        return dict(_load_env_once())
         
     def authenticate(self) -> bool:
         """Authenticate with Robinhood"""
-        pickle_path = os.path.join(os.getcwd(), "robinhood.pickle")
+        pickle_path = TOKEN_PATH
         
-        print(f"{Fore.CYAN}Authentication token path: {pickle_path}{Style.RESET_ALL}")
+        click.secho(f"Authentication token path: {pickle_path}", fg='cyan')
         
-        # Try to use existing pickle file first
+        # Try to use existing pickle file first. If the token has expired, rs.login
+        # falls back to a normal login, so pass the .env credentials to keep it
+        # from prompting for them.
         if os.path.exists(pickle_path):
-            print(f"{Fore.GREEN}✓ Found existing authentication token{Style.RESET_ALL}")
-            print(f"{Fore.CYAN}Attempting to authenticate with saved token...{Style.RESET_ALL}")
+            click.secho("✓ Found existing authentication token", fg='green')
+            click.secho("Attempting to authenticate with saved token...", fg='cyan')
             try:
                 # Try to load existing session
-                login = rs.login(store_session=True, pickle_name='robinhood')
+                login = rs.login(
+                    username=self._env['ROBINHOOD_USERNAME'],
+                    password=self._env['ROBINHOOD_PASSWORD'],
+                    store_session=True,
+                    pickle_name=TOKEN_PICKLE_NAME
+                )
                 if login:
                     self.authenticated = True
-                    print(f"{Fore.GREEN}✓ Successfully authenticated using saved token{Style.RESET_ALL}")
+                    self._configure_session()
+                    click.secho("✓ Successfully authenticated using saved token", fg='green')
                     return True
                 else:
-                    print(f"{Fore.YELLOW}Saved token invalid or expired{Style.RESET_ALL}")
-                    print(f"{Fore.CYAN}Removing old token and requesting new login...{Style.RESET_ALL}")
-                    os.remove(pickle_path)
-            except Exception as e:
-                print(f"{Fore.YELLOW}Could not use saved token: {e}{Style.RESET_ALL}")
-                if os.path.exists(pickle_path):
+                    click.secho("Saved token invalid or expired", fg='yellow')
+                    click.secho("Removing old token and requesting new login...", fg='cyan')
                     try:
                         os.remove(pickle_path)
-                        print(f"{Fore.CYAN}Removed invalid token file{Style.RESET_ALL}")
-                    except:
+                    except FileNotFoundError:
                         pass
+            except Exception as e:
+                click.secho(f"Could not use saved token: {e}", fg='yellow')
+                try:
+                    os.remove(pickle_path)
+                    click.secho("Removed invalid token file", fg='cyan')
+                except OSError:
+                    pass
         
         # Get credentials
-        username = os.getenv('ROBINHOOD_USERNAME')
-        password = os.getenv('ROBINHOOD_PASSWORD')
-        totp_secret = os.getenv('ROBINHOOD_TOTP_SECRET')  # The secret key for TOTP generation
+        username = self._env['ROBINHOOD_USERNAME']
+        password = self._env['ROBINHOOD_PASSWORD']
         
         if not username:
             username = input("Enter your Robinhood username (email): ")
@@ -95,141 +396,187 @@ class RobinhoodPositionManager:
         
         # Generate or get MFA code
         mfa_code = None
-        if totp_secret:
+        if self._totp:
             # Automatically generate MFA code using TOTP secret
             try:
-                totp = pyotp.TOTP(totp_secret)
-                mfa_code = totp.now()
-                print(f"\n{Fore.GREEN}✓ Generated 2FA code automatically{Style.RESET_ALL}")
-                print(f"{Fore.CYAN}Code: {mfa_code[:3]}xxx (expires in ~{30 - (time.time() % 30):.0f} seconds){Style.RESET_ALL}")
+                mfa_code = self._totp.now()
+                click.secho("\n✓ Generated 2FA code automatically", fg='green')
+                click.secho(f"Code: {mfa_code[:3]}xxx (expires in ~{30 - (time.time() % 30):.0f} seconds)", fg='cyan')
             except Exception as e:
-                print(f"{Fore.YELLOW}Warning: Could not generate TOTP code: {e}{Style.RESET_ALL}")
-                print(f"{Fore.YELLOW}Falling back to manual entry...{Style.RESET_ALL}")
+                click.secho(f"Warning: Could not generate TOTP code: {e}", fg='yellow')
+                click.secho("Falling back to manual entry...", fg='yellow')
         
         # Fall back to manual entry if no TOTP secret or generation failed
         if not mfa_code:
             # Check for hardcoded MFA code in env (not recommended)
-            mfa_code = os.getenv('ROBINHOOD_MFA_CODE')
+            mfa_code = self._env['ROBINHOOD_MFA_CODE']
             if not mfa_code:
-                print(f"\n{Fore.YELLOW}Note: 2FA code is required for first-time login{Style.RESET_ALL}")
-                print(f"{Fore.CYAN}Tip: Add ROBINHOOD_TOTP_SECRET to your .env file to auto-generate codes{Style.RESET_ALL}")
+                click.secho("\nNote: 2FA code is required for first-time login", fg='yellow')
+                click.secho("Tip: Add ROBINHOOD_TOTP_SECRET to your .env file to auto-generate codes", fg='cyan')
                 mfa_code = input("Enter your 2FA code (required if 2FA is enabled): ").strip()
         
         # Initial login attempt
         max_attempts = 3
         for attempt in range(max_attempts):
             try:
-                print(f"\n{Fore.CYAN}Attempting authentication (attempt {attempt + 1}/{max_attempts})...{Style.RESET_ALL}")
+                click.secho(f"\nAttempting authentication (attempt {attempt + 1}/{max_attempts})...", fg='cyan')
                 
                 # Always provide mfa_code parameter (can be empty string)
                 if mfa_code:
-                    print(f"{Fore.CYAN}Using 2FA code: {mfa_code[:3]}...{Style.RESET_ALL}")
+                    click.secho(f"Using 2FA code: {mfa_code[:3]}...", fg='cyan')
                     login = rs.login(
                         username=username, 
                         password=password, 
                         mfa_code=mfa_code, 
                         store_session=True,  # Explicitly request session storage
-                        pickle_name='robinhood'
+                        pickle_name=TOKEN_PICKLE_NAME
                     )
                 else:
-                    print(f"{Fore.CYAN}Attempting login without 2FA...{Style.RESET_ALL}")
+                    click.secho("Attempting login without 2FA...", fg='cyan')
                     login = rs.login(
                         username=username, 
                         password=password, 
                         store_session=True,  # Explicitly request session storage
-                        pickle_name='robinhood'
+                        pickle_name=TOKEN_PICKLE_NAME
                     )
                 
                 if login:
                     self.authenticated = True
-                    print(f"{Fore.GREEN}✓ Successfully authenticated with Robinhood{Style.RESET_ALL}")
+                    self._configure_session()
+                    click.secho("✓ Successfully authenticated with Robinhood", fg='green')
                     
-                    # Check if pickle file was created
-                    time.sleep(0.5)  # Give it a moment to write the file
+                    # rs.login writes the token before returning, so check for it right away
+                    self._repack_session(pickle_path)
                     
-                    if os.path.exists(pickle_path):
-                        file_size = os.path.getsize(pickle_path)
-                        print(f"{Fore.GREEN}✓ Authentication token saved ({file_size} bytes){Style.RESET_ALL}")
-                        print(f"{Fore.CYAN}  Token location: {pickle_path}{Style.RESET_ALL}")
+                    try:
+                        file_size = os.stat(pickle_path).st_size
+                    except FileNotFoundError:
+                        file_size = None
+                    
+                    if file_size is not None:
+                        click.secho(f"✓ Authentication token saved ({file_size} bytes)", fg='green')
+                        if os.getenv('ROB_DEBUG'):
+                            click.secho(f"  Token location: {pickle_path}", fg='cyan')
                     else:
-                        print(f"{Fore.YELLOW}⚠ Warning: Authentication token was not saved{Style.RESET_ALL}")
-                        print(f"{Fore.YELLOW}  You'll need to authenticate again next time{Style.RESET_ALL}")
+                        click.secho("⚠ Warning: Authentication token was not saved", fg='yellow')
+                        click.secho("  You'll need to authenticate again next time", fg='yellow')
                         
-                        # List all pickle files in directory
-                        pickle_files = [f for f in os.listdir(os.getcwd()) if 'pickle' in f.lower()]
-                        if pickle_files:
-                            print(f"{Fore.CYAN}  Found these pickle files: {', '.join(pickle_files)}{Style.RESET_ALL}")
+                        # List all pickle files in directory (diagnostics only)
+                        if os.getenv('ROB_DEBUG'):
+                            token_dir = os.path.dirname(pickle_path)
+                            try:
+                                pickle_files = [f for f in os.listdir(token_dir) if 'pickle' in f.lower()]
+                            except FileNotFoundError:
+                                pickle_files = []
+                            if pickle_files:
+                                click.secho(f"  Found these pickle files: {', '.join(pickle_files)}", fg='cyan')
                     
                     return True
                 else:
-                    print(f"{Fore.RED}Authentication failed{Style.RESET_ALL}")
+                    click.secho("Authentication failed", fg='red')
                     
             except Exception as e:
                 error_msg = str(e)
+                err_lc = error_msg.lower()
                 
                 # The 'detail' error specifically means device verification is required
-                if "'detail'" in error_msg or "detail" in error_msg:
-                    print(f"\n{Fore.YELLOW}═══════════════════════════════════════════{Style.RESET_ALL}")
-                    print(f"{Fore.YELLOW}     DEVICE VERIFICATION REQUIRED!{Style.RESET_ALL}")
-                    print(f"{Fore.YELLOW}═══════════════════════════════════════════{Style.RESET_ALL}")
-                    print(f"\n{Fore.CYAN}Robinhood needs you to approve this login:{Style.RESET_ALL}")
-                    print(f"  1. {Fore.WHITE}Open your Robinhood app{Style.RESET_ALL}")
-                    print(f"  2. {Fore.WHITE}Look for 'Is this you trying to log in?' notification{Style.RESET_ALL}")
-                    print(f"  3. {Fore.WHITE}Tap 'Yes, it's me' to approve{Style.RESET_ALL}")
-                    print(f"  4. {Fore.WHITE}Come back here and press ENTER{Style.RESET_ALL}")
+                if "detail" in error_msg:
+                    click.secho("\n═══════════════════════════════════════════", fg='yellow')
+                    click.secho("     DEVICE VERIFICATION REQUIRED!", fg='yellow')
+                    click.secho("═══════════════════════════════════════════", fg='yellow')
+                    click.secho("\nRobinhood needs you to approve this login:", fg='cyan')
+                    click.echo("  1. " + click.style("Open your Robinhood app", fg='white'))
+                    click.echo("  2. " + click.style("Look for 'Is this you trying to log in?' notification", fg='white'))
+                    click.echo("  3. " + click.style("Tap 'Yes, it's me' to approve", fg='white'))
+                    click.echo("  4. " + click.style("Come back here and press ENTER", fg='white'))
                     
-                    input(f"\n{Fore.YELLOW}➜ Press ENTER after approving on your device...{Style.RESET_ALL}")
+                    prompt_input(click.style("\n➜ Press ENTER after approving on your device...", fg='yellow'))
                     
                     # Clear MFA for retry - it was already consumed
                     mfa_code = ''
-                    print(f"\n{Fore.CYAN}Retrying authentication...{Style.RESET_ALL}")
+                    click.secho("\nRetrying authentication...", fg='cyan')
                     
                     # Small delay to ensure device approval is registered
                     time.sleep(3)
                     continue
                 
                 # Other device/challenge errors
-                elif 'challenge' in error_msg.lower() or 'device' in error_msg.lower():
-                    print(f"\n{Fore.YELLOW}Authentication challenge detected: {error_msg}{Style.RESET_ALL}")
-                    input(f"{Fore.YELLOW}Complete any required steps and press ENTER to retry...{Style.RESET_ALL}")
+                elif any(token in err_lc for token in DEVICE_TOKENS):
+                    click.secho(f"\nAuthentication challenge detected: {error_msg}", fg='yellow')
+                    prompt_input(click.style("Complete any required steps and press ENTER to retry...", fg='yellow'))
                     mfa_code = ''
                     time.sleep(2)
                     continue
                 
                 # Check for invalid MFA
-                elif 'mfa' in error_msg.lower() or 'code' in error_msg.lower():
-                    if totp_secret and attempt < max_attempts - 1:
+                elif any(token in err_lc for token in MFA_TOKENS):
+                    if self._totp and attempt < max_attempts - 1:
                         # Regenerate TOTP code (it might have expired)
-                        print(f"{Fore.YELLOW}2FA code may have expired. Regenerating...{Style.RESET_ALL}")
+                        click.secho("2FA code may have expired. Regenerating...", fg='yellow')
                         time.sleep(2)  # Wait a bit to ensure we get a new code
-                        totp = pyotp.TOTP(totp_secret)
-                        mfa_code = totp.now()
-                        print(f"{Fore.CYAN}New code: {mfa_code[:3]}xxx{Style.RESET_ALL}")
+                        mfa_code = self._totp.now()
+                        click.secho(f"New code: {mfa_code[:3]}xxx", fg='cyan')
                         continue
                     elif attempt == 0:
-                        print(f"{Fore.RED}Invalid 2FA code. Trying without it...{Style.RESET_ALL}")
+                        click.secho("Invalid 2FA code. Trying without it...", fg='red')
                         mfa_code = None
                         continue
                     else:
-                        print(f"{Fore.RED}Authentication failed: Invalid credentials or 2FA code{Style.RESET_ALL}")
+                        click.secho("Authentication failed: Invalid credentials or 2FA code", fg='red')
                         return False
                 
                 # Other errors
                 else:
                     if attempt < max_attempts - 1:
-                        print(f"{Fore.YELLOW}Retrying...{Style.RESET_ALL}")
+                        click.secho("Retrying...", fg='yellow')
                         time.sleep(2)
                         continue
                     else:
-                        print(f"{Fore.RED}✗ Authentication failed after {max_attempts} attempts{Style.RESET_ALL}")
-                        print(f"{Fore.YELLOW}Tips:{Style.RESET_ALL}")
-                        print(f"  - Make sure your username and password are correct")
-                        print(f"  - If using 2FA, ensure the code is current (within 30 seconds)")
-                        print(f"  - Try logging into Robinhood website first to verify your account")
+                        click.secho(f"✗ Authentication failed after {max_attempts} attempts", fg='red')
+                        click.secho("Tips:", fg='yellow')
+                        click.echo("  - Make sure your username and password are correct")
+                        click.echo("  - If using 2FA, ensure the code is current (within 30 seconds)")
+                        click.echo("  - Try logging into Robinhood website first to verify your account")
                         return False
         
         return False
     
+    def _configure_session(self):
+        """Enable connection pooling on robin_stocks' shared requests session"""
+        session = getattr(rs.helper, 'SESSION', None)
+        if session is None:
+            return
+        # Retry only applies to idempotent methods, so order POSTs are never resent
+        adapter = HTTPAdapter(
+            pool_connections=HTTP_POOL_SIZE,
+            pool_maxsize=HTTP_POOL_SIZE,
+            max_retries=Retry(total=2, backoff_factor=0.3)
+        )
+        session.mount('https://', adapter)
+        self._session = session
+    
+    def _repack_session(self, pickle_path: str):
+        """Rewrite the saved session token using the highest pickle protocol"""
+        try:
+            with open(pickle_path, 'rb') as f:
+                session = pickle.load(f)
+            # Write to a temp file and swap it in so a crash can't corrupt the token
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(pickle_path), suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    pickle.dump(session, f, protocol=pickle.HIGHEST_PROTOCOL)
+                os.replace(tmp_path, pickle_path)
+            except BaseException:
+                try:
+                    os.remove(tmp_path)
+                except OSError:
+                    pass
+                raise
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            click.secho(f"Could not re-save authentication token: {e}", fg='yellow')
+    
     def get_portfolio_summary(self) -> Tuple[float, float, float]:
         """
         Get portfolio summary including total value and available cash
@@ -238,77 +585,149 @@ class RobinhoodPositionManager:
             Tuple of (portfolio_value, available_cash, positions_value)
         """
         try:
-            # Get account profile data
-            profile = rs.profiles.load_account_profile()
-            
-            # Get portfolio data
-            portfolio = rs.profiles.load_portfolio_profile()
-            
-            # Get available cash (buying power)
-            available_cash = float(profile.get('buying_power', 0))
-            
-            # Get total portfolio value (equity)
-            portfolio_value = float(portfolio.get('extended_hours_equity') or 
-                                   portfolio.get('equity') or 0)
-            
-            # Calculate positions value (portfolio minus cash)
-            positions_value = portfolio_value - available_cash
-            
-            return portfolio_value, available_cash, positions_value
-            
+            return self._load_portfolio_summary()
         except Exception as e:
-            print(f"{Fore.RED}Error fetching portfolio summary: {e}{Style.RESET_ALL}")
+            click.secho(f"Error fetching portfolio summary: {e}", fg='red')
             return 0.0, 0.0, 0.0
     
+    @_memoize_method
+    def _load_portfolio_summary(self) -> Tuple[float, float, float]:
+        """Fetch the portfolio summary from Robinhood, raising on API errors"""
+        # Get account profile data
+        profile = rs.profiles.load_account_profile()
+        
+        # Get portfolio data
+        portfolio = rs.profiles.load_portfolio_profile()
+        
+        # Get available cash (buying power)
+        available_cash = float(profile.get('buying_power', 0))
+        
+        # Get total portfolio value (equity)
+        portfolio_value = float(portfolio.get('extended_hours_equity') or 
+                               portfolio.get('equity') or 0)
+        
+        # Calculate positions value (portfolio minus cash)
+        positions_value = portfolio_value - available_cash
+        
+        return portfolio_value, available_cash, positions_value
+    
     def get_positions(self) -> Dict:
         """Get all current positions"""
         try:
-            positions = rs.build_holdings()
-            return positions
+            return self._load_positions()
         except Exception as e:
-            print(f"{Fore.RED}Error fetching positions: {e}{Style.RESET_ALL}")
+            click.secho(f"Error fetching positions: {e}", fg='red')
+            return {}
+    
+    @_memoize_method
+    def _load_positions(self) -> Dict:
+        """Fetch holdings from Robinhood, raising on API errors"""
+        return rs.build_holdings()
+    
+    def _fetch_price(self, symbol: str) -> Optional[float]:
+        """Fetch the latest price for a single symbol"""
+        try:
+            return float(rs.stocks.get_latest_price(symbol)[0])
+        except Exception:
+            return None
+
+    def get_latest_prices(self, symbols: List[str]) -> Dict[str, float]:
+        """
+        Fetch latest prices for all symbols in a single request, falling back
+        to concurrent per-symbol requests if the batch call fails
+        
+        Returns:
+            Dict of symbol to price; symbols that could not be priced are omitted
+        """
+        symbols = list(symbols)
+        if not symbols:
             return {}
+        try:
+            prices = rs.stocks.get_latest_price(symbols)
+            if len(prices) != len(symbols):
+                raise ValueError("batch price lookup returned incomplete results")
+        except Exception:
+            with ThreadPoolExecutor(max_workers=PRICE_FETCH_WORKERS) as executor:
+                prices = list(executor.map(self._fetch_price, symbols))
+        return {
+            symbol: float(price)
+            for symbol, price in zip(symbols, prices)
+            if price is not None
+        }
     
-    def calculate_total_expected_cost(self, action: str, percentage: float) -> float:
+    def calculate_total_expected_cost(self, action: str, percentage: float,
+                                      positions: Optional[Dict] = None,
+                                      plan: Optional[TradePlan] = None) -> float:
         """
         Calculate the total expected cost for all positions
         
+        Args:
+            positions: Prefetched holdings; fetched if not provided
+            plan: Prebuilt trade plan from plan_trades; built if not provided
+        
         Returns:
             Total expected cost/proceeds for the operation
         """
-        positions = self.get_positions()
-        if not positions:
-            return 0.0
+        if plan is None:
+            if positions is None:
+                positions = self.get_positions()
+            if not positions:
+                return 0.0
+            plan = self.plan_trades(positions, action, percentage)
+        
+        _, _, _, costs = plan
+        return float(sum(costs))
+    
+    def plan_trades(self, positions: Dict, action: str, percentage: float) -> TradePlan:
+        """
+        Price every position in one batch and compute its trade
         
-        total_cost = 0.0
+        Positions that cannot be priced are left out of the plan.
+        
+        Returns:
+            Parallel lists of (symbols, prices, shares_to_trade, costs), sorted by symbol
+        """
+        symbols = sorted(positions)
+        latest_prices = self.get_latest_prices(symbols)
         
-        for symbol, position_data in positions.items():
+        planned_symbols, prices, shares, costs = [], [], [], []
+        for symbol in symbols:
             try:
+                price = latest_prices[symbol]
                 shares_to_trade, cost = self.calculate_shares_to_trade(
-                    symbol, position_data, percentage, action
+                    symbol, positions[symbol], percentage, action, price=price
                 )
-                total_cost += cost
             except Exception:
                 continue
+            planned_symbols.append(symbol)
+            prices.append(price)
+            shares.append(shares_to_trade)
+            costs.append(cost)
         
-        return total_cost
+        return planned_symbols, prices, shares, costs
     
     def calculate_shares_to_trade(self, symbol: str, position_data: Dict, 
-                                  percentage: float, action: str) -> Tuple[int, float]:
+                                  percentage: float, action: str,
+                                  price: Optional[float] = None) -> Tuple[int, float]:
         """
         Calculate the number of shares to buy/sell and the estimated cost
         
+        Args:
+            price: Already-fetched latest price; looked up if not provided
+        
         Returns:
             Tuple of (shares_to_trade, estimated_cost)
         """
         current_shares = float(position_data.get('quantity', 0))
-        current_price = float(rs.stocks.get_latest_price(symbol)[0])
+        if price is None:
+            current_price = float(rs.stocks.get_latest_price(symbol)[0])
+        else:
+            current_price = price
         
         if action == 'increase':
-            # Calculate shares to add based on percentage of current position value
-            current_value = current_shares * current_price
-            amount_to_add = current_value * (percentage / 100)
-            shares_to_buy = int(amount_to_add / current_price)
+            # Adding percentage of the position's value buys the same percentage of
+            # its shares, since the price cancels out
+            shares_to_buy = int(current_shares * (percentage / 100))
             estimated_cost = shares_to_buy * current_price
             return shares_to_buy, estimated_cost
             
@@ -320,6 +739,20 @@ class RobinhoodPositionManager:
     
     def execute_trade(self, symbol: str, shares: int, action: str) -> bool:
         """Execute a buy or sell order"""
+        success, message = self._place_order(symbol, shares, action)
+        click.echo(message)
+        return success
+    
+    def _place_order(self, symbol: str, shares: int, action: str) -> Tuple[bool, str]:
+        """
+        Place a buy or sell order without printing anything
+        
+        Safe to call from worker threads; the caller echoes the message on the
+        main thread, where click's context (and --no-color) is visible.
+        
+        Returns:
+            Tuple of (success, result_line)
+        """
         try:
             if action == 'increase':
                 # Place market buy order
@@ -329,8 +762,8 @@ class RobinhoodPositionManager:
                     timeInForce='gfd'  # Good for day
                 )
                 if order:
-                    print(f"{Fore.GREEN}✓ Bought {shares} shares of {symbol}{Style.RESET_ALL}")
-                    return True
+                    self._cache.clear()  # Holdings and cash have changed
+                    return True, f"{C_OK}Bought {shares} shares of {symbol}{RESET}"
             else:  # decrease
                 # Place market sell order
                 order = rs.orders.order_sell_market(
@@ -339,113 +772,146 @@ class RobinhoodPositionManager:
                     timeInForce='gfd'
                 )
                 if order:
-                    print(f"{Fore.GREEN}✓ Sold {shares} shares of {symbol}{Style.RESET_ALL}")
-                    return True
+                    self._cache.clear()  # Holdings and cash have changed
+                    return True, f"{C_OK}Sold {shares} shares of {symbol}{RESET}"
             
-            print(f"{Fore.RED}✗ Order failed for {symbol}{Style.RESET_ALL}")
-            return False
+            return False, C_ERR + 'Order failed for ' + symbol + RESET
             
         except Exception as e:
-            print(f"{Fore.RED}✗ Trade execution error for {symbol}: {e}{Style.RESET_ALL}")
-            return False
+            return False, f"{C_ERR}Trade execution error for {symbol}: {e}{RESET}"
     
-    def process_positions(self, action: str, percentage: float, dry_run: bool = False, auto_confirm: bool = False):
-        """Process positions one by one"""
-        positions = self.get_positions()
+    def process_positions(self, action: str, percentage: float, dry_run: bool = False,
+                          auto_confirm: bool = False, positions: Optional[Dict] = None,
+                          plan: Optional[TradePlan] = None):
+        """
+        Process positions one by one
+        
+        Pass the plan the user confirmed so the listing trades exactly those
+        shares at those prices; otherwise the positions are priced again here.
+        """
+        if positions is None:
+            positions = self.get_positions()
 
         if not positions:
-            print(f"{Fore.YELLOW}No positions found in your account{Style.RESET_ALL}")
+            click.secho("No positions found in your account", fg='yellow')
             return
 
-        print(f"\n{Fore.CYAN}{'='*60}{Style.RESET_ALL}")
+        click.secho(f"\n{'='*60}", fg='cyan')
         if dry_run:
-            print(f"{Fore.CYAN}DRY RUN - Processing positions to {action} by {percentage}%{Style.RESET_ALL}")
+            click.secho(f"DRY RUN - Processing positions to {action} by {percentage}%", fg='cyan')
         else:
-            print(f"{Fore.CYAN}Processing positions to {action} by {percentage}%{Style.RESET_ALL}")
-        print(f"{Fore.CYAN}{'='*60}{Style.RESET_ALL}\n")
+            click.secho(f"Processing positions to {action} by {percentage}%", fg='cyan')
+        click.secho(f"{'='*60}\n", fg='cyan')
+
+        # Plan is sorted by symbol for consistent ordering
+        if plan is None:
+            plan = self.plan_trades(positions, action, percentage)
+        symbols = plan[0]
+        total_positions = len(symbols)
 
-        # Sort positions by symbol for consistent ordering
-        sorted_positions = sorted(positions.items())
-        total_positions = len(sorted_positions)
+        for symbol in sorted(set(positions) - set(symbols)):
+            click.echo(C_ERR_PROCESSING + symbol + ': could not price position' + RESET)
 
-        for index, (symbol, position_data) in enumerate(sorted_positions, 1):
+        # Auto-confirmed trades are queued and placed together after the listing
+        queued_trades = []
+
+        for index, (symbol, current_price, shares_to_trade, cost) in enumerate(zip(*plan), 1):
+            position_data = positions[symbol]
             try:
-                # Get current price and calculate trade
-                current_price = float(rs.stocks.get_latest_price(symbol)[0])
                 current_shares = float(position_data.get('quantity', 0))
                 avg_cost = float(position_data.get('average_buy_price', 0))
 
-                shares_to_trade, cost = self.calculate_shares_to_trade(
-                    symbol, position_data, percentage, action
-                )
-
                 if shares_to_trade == 0:
-                    print(f"{Fore.YELLOW}Skipping {symbol} - calculated 0 shares to trade{Style.RESET_ALL}")
+                    click.echo(C_SKIP + symbol + ' - calculated 0 shares to trade' + RESET)
                     continue
 
-                # Display position information
-                print(f"{Fore.WHITE}[{index}/{total_positions}] {Fore.CYAN}{symbol}{Style.RESET_ALL}")
-                print(f"  Current position: {current_shares:.2f} shares @ ${avg_cost:.2f} avg")
-                print(f"  Current price: ${current_price:.2f}")
+                # Display position information, buffered into a single write per symbol
+                lines = [
+                    click.style(f"[{index}/{total_positions}] ", fg='white') + click.style(symbol, fg='cyan'),
+                    f"  Current position: {current_shares:.2f} shares @ ${avg_cost:.2f} avg",
+                    f"  Current price: ${current_price:.2f}",
+                ]
 
-                if action == 'increase':
-                    print(f"  {Fore.GREEN}→ BUY {shares_to_trade} shares for ~${cost:.2f}{Style.RESET_ALL}")
-                else:
-                    print(f"  {Fore.RED}→ SELL {shares_to_trade} shares for ~${cost:.2f}{Style.RESET_ALL}")
+                trade_prefix = C_BUY if action == 'increase' else C_SELL
+                lines.append(f"{trade_prefix}{shares_to_trade} shares for ~${cost:.2f}{RESET}")
 
                 # Handle confirmation based on mode
                 if dry_run:
-                    print(f"{Fore.CYAN}DRY RUN: Would execute trade{Style.RESET_ALL}")
+                    lines.append(C_DRY_RUN_TRADE)
+                    click.echo('\n'.join(lines))
                 elif auto_confirm:
-                    print(f"{Fore.GREEN}Auto-confirming trade...{Style.RESET_ALL}")
-                    success = self.execute_trade(symbol, shares_to_trade, action)
-                    if success:
-                        time.sleep(1)  # Small delay between trades
+                    lines.append(C_AUTO_CONFIRM)
+                    click.echo('\n'.join(lines))
+                    queued_trades.append((symbol, shares_to_trade, action))
                 else:
                     # Wait for user confirmation
-                    print(f"\n  {Fore.YELLOW}Press ENTER to execute, 'skip' to skip, or 'abort' to exit:{Style.RESET_ALL} ", end='')
-                    user_input = input().strip().lower()
+                    click.echo('\n'.join(lines), nl=False)
+                    user_input = prompt_input(PROMPT_TRADE).strip().lower()
 
                     if user_input == 'abort':
-                        print(f"\n{Fore.RED}Aborting... No further trades will be executed.{Style.RESET_ALL}")
+                        click.secho("\nAborting... No further trades will be executed.", fg='red')
                         break
                     elif user_input == 'skip' or user_input == 's':
-                        print(f"{Fore.YELLOW}Skipping {symbol}{Style.RESET_ALL}")
-                        print(f"{Fore.CYAN}{'-'*60}{Style.RESET_ALL}\n")
+                        click.echo(C_SKIP + symbol + RESET)
+                        click.echo(SEP)
                         continue
                     elif user_input == '':
                         # Execute the trade
                         success = self.execute_trade(symbol, shares_to_trade, action)
-                        if success:
-                            time.sleep(1)  # Small delay between trades
+                        if success and self.trade_delay:
+                            time.sleep(self.trade_delay)
                     else:
-                        print(f"{Fore.YELLOW}Invalid input. Skipping {symbol}{Style.RESET_ALL}")
+                        click.secho('Invalid input. Skipping ' + symbol, fg='yellow')
 
-                print(f"{Fore.CYAN}{'-'*60}{Style.RESET_ALL}\n")
+                click.echo(SEP)
 
             except Exception as e:
-                print(f"{Fore.RED}Error processing {symbol}: {e}{Style.RESET_ALL}")
-                print(f"{Fore.CYAN}{'-'*60}{Style.RESET_ALL}\n")
+                click.echo(f"{C_ERR_PROCESSING}{symbol}: {e}{RESET}")
+                click.echo(SEP)
                 continue
 
+        if queued_trades:
+            click.secho(f"Executing {len(queued_trades)} trades...", fg='cyan')
+            self._execute_trades(queued_trades)
+
         if dry_run:
-            print(f"\n{Fore.GREEN}Dry run complete! No trades were executed.{Style.RESET_ALL}")
+            click.secho("\nDry run complete! No trades were executed.", fg='green')
         else:
-            print(f"\n{Fore.GREEN}Position processing complete!{Style.RESET_ALL}")
+            click.secho("\nPosition processing complete!", fg='green')
+    
+    def _execute_trades(self, trades: List[Tuple[str, int, str]]):
+        """
+        Execute queued (symbol, shares, action) trades
+        
+        Orders are placed concurrently unless a trade delay is configured,
+        in which case they run one at a time with the delay between them.
+        """
+        if self.trade_delay:
+            for trade in trades:
+                if self.execute_trade(*trade):
+                    time.sleep(self.trade_delay)
+            return
+        
+        with ThreadPoolExecutor(max_workers=TRADE_WORKERS) as executor:
+            for _, message in executor.map(lambda trade: self._place_order(*trade), trades):
+                click.echo(message)
     
     def logout(self):
         """Logout from Robinhood"""
         try:
             rs.logout()
-            print(f"{Fore.GREEN}✓ Logged out successfully{Style.RESET_ALL}")
+            click.secho("✓ Logged out successfully", fg='green')
         except:
             pass
 
 @click.group()
 @click.version_option(version="1.0.0", prog_name="rob")
-def cli():
+@click.option('--no-color', is_flag=True, help='Disable colored output')
+@click.pass_context
+def cli(ctx, no_color):
     """Robinhood Position Manager - Manage your portfolio positions in bulk"""
-    pass
+    if no_color:
+        ctx.color = False
 
 @cli.command()
 @click.option('--action', '-a', type=click.Choice(['increase', 'decrease']), required=True,
@@ -456,72 +922,63 @@ def cli():
               help='Auto-confirm the operation without prompting')
 @click.option('--dry-run', is_flag=True,
               help='Show what would be done without executing trades')
-def adjust(action, percentage, confirm, dry_run):
+@click.option('--trade-delay', type=click.FloatRange(min=0), default=0.0, show_default=True,
+              help='Seconds to wait between executed trades')
+def adjust(action, percentage, confirm, dry_run, trade_delay):
     """Adjust positions by a percentage"""
     if not (0 < percentage <= 100):
-        click.echo(f"{Fore.RED}Error: Percentage must be between 0 and 100{Style.RESET_ALL}")
+        click.secho("Error: Percentage must be between 0 and 100", fg='red')
         return
 
-    manager = RobinhoodPositionManager()
+    manager = RobinhoodPositionManager(trade_delay=trade_delay)
 
     try:
         # Header
-        click.echo(f"\n{Fore.CYAN}{'='*60}{Style.RESET_ALL}")
-        click.echo(f"{Fore.CYAN}         Robinhood Position Manager{Style.RESET_ALL}")
-        click.echo(f"{Fore.CYAN}{'='*60}{Style.RESET_ALL}\n")
+        click.secho(f"\n{'='*60}", fg='cyan')
+        click.secho("         Robinhood Position Manager", fg='cyan')
+        click.secho(f"{'='*60}\n", fg='cyan')
 
         # Authenticate
         if not manager.authenticate():
             sys.exit(1)
 
         # Fetch and display portfolio summary
-        click.echo(f"{Fore.CYAN}Fetching portfolio information...{Style.RESET_ALL}")
+        click.secho("Fetching portfolio information...", fg='cyan')
         portfolio_value, available_cash, positions_value = manager.get_portfolio_summary()
 
-        click.echo(f"\n{Fore.WHITE}Portfolio Summary:{Style.RESET_ALL}")
-        click.echo(f"  {Fore.GREEN}Total Portfolio Value: ${portfolio_value:,.2f}{Style.RESET_ALL}")
-        click.echo(f"  {Fore.YELLOW}Available Cash: ${available_cash:,.2f}{Style.RESET_ALL}")
-        click.echo(f"  {Fore.CYAN}Positions Value: ${positions_value:,.2f}{Style.RESET_ALL}")
+        click.secho("\nPortfolio Summary:", fg='white')
+        click.secho("  Total Portfolio Value: " + fmt_money(to_cents(portfolio_value)), fg='green')
+        click.secho("  Available Cash: " + fmt_money(to_cents(available_cash)), fg='yellow')
+        click.secho("  Positions Value: " + fmt_money(to_cents(positions_value)), fg='cyan')
 
         # Calculate and display expected cost
-        click.echo(f"\n{Fore.CYAN}Calculating expected cost...{Style.RESET_ALL}")
-        expected_cost = manager.calculate_total_expected_cost(action, percentage)
-
-        click.echo(f"\n{Fore.WHITE}Operation Summary:{Style.RESET_ALL}")
-        click.echo(f"  Action: {Fore.CYAN}{action.upper()}{Style.RESET_ALL} positions by {Fore.YELLOW}{percentage}%{Style.RESET_ALL}")
+        click.secho("\nCalculating expected cost...", fg='cyan')
+        positions = manager.get_positions()
+        plan = manager.plan_trades(positions, action, percentage)
+        expected_cost = manager.calculate_total_expected_cost(action, percentage, plan=plan)
 
-        if action == 'increase':
-            click.echo(f"  Expected Total Cost: {Fore.RED}${expected_cost:,.2f}{Style.RESET_ALL}")
-            click.echo(f"  Available Cash: {Fore.GREEN}${available_cash:,.2f}{Style.RESET_ALL}")
-
-            # Check if user has enough cash
-            if expected_cost > available_cash:
-                click.echo(f"\n{Fore.RED}❌ ERROR: Insufficient funds!{Style.RESET_ALL}")
-                click.echo(f"{Fore.RED}You need ${expected_cost:,.2f} but only have ${available_cash:,.2f} available.{Style.RESET_ALL}")
-                click.echo(f"{Fore.YELLOW}Try a smaller percentage or sell some positions first.{Style.RESET_ALL}")
-                return
-            else:
-                click.echo(f"  Remaining Cash After: {Fore.GREEN}${available_cash - expected_cost:,.2f}{Style.RESET_ALL}")
-        else:
-            click.echo(f"  Expected Proceeds: {Fore.GREEN}${expected_cost:,.2f}{Style.RESET_ALL}")
-            click.echo(f"  Cash After Selling: {Fore.GREEN}${available_cash + expected_cost:,.2f}{Style.RESET_ALL}")
+        summary, affordable = _format_operation_summary(action, percentage, expected_cost, available_cash)
+        click.echo(summary, nl=False)
+        if not affordable:
+            return
 
         # Confirm before proceeding
         if confirm and not dry_run:
-            if not click.confirm(f"\n{Fore.YELLOW}Proceed with {action}ing positions?{Style.RESET_ALL}"):
-                click.echo(f"\n{Fore.YELLOW}Operation cancelled.{Style.RESET_ALL}")
+            if not click.confirm(click.style(f"\nProceed with {action}ing positions?", fg='yellow')):
+                click.secho("\nOperation cancelled.", fg='yellow')
                 return
 
         if dry_run:
-            click.echo(f"\n{Fore.YELLOW}DRY RUN - No trades will be executed{Style.RESET_ALL}")
+            click.secho("\nDRY RUN - No trades will be executed", fg='yellow')
 
         # Process positions
-        manager.process_positions(action, percentage, dry_run=dry_run, auto_confirm=not confirm)
+        manager.process_positions(action, percentage, dry_run=dry_run, auto_confirm=not confirm,
+                                  positions=positions, plan=plan)
 
     except KeyboardInterrupt:
-        click.echo(f"\n\n{Fore.YELLOW}Interrupted by user{Style.RESET_ALL}")
+        click.secho("\n\nInterrupted by user", fg='yellow')
     except Exception as e:
-        click.echo(f"\n{Fore.RED}Unexpected error: {e}{Style.RESET_ALL}")
+        click.secho(f"\nUnexpected error: {e}", fg='red')
     finally:
         manager.logout()
 
@@ -536,26 +993,33 @@ def portfolio():
             sys.exit(1)
 
         # Fetch and display portfolio summary
-        click.echo(f"{Fore.CYAN}Fetching portfolio information...{Style.RESET_ALL}")
+        click.secho("Fetching portfolio information...", fg='cyan')
         portfolio_value, available_cash, positions_value = manager.get_portfolio_summary()
 
-        click.echo(f"\n{Fore.WHITE}Portfolio Summary:{Style.RESET_ALL}")
-        click.echo(f"  {Fore.GREEN}Total Portfolio Value: ${portfolio_value:,.2f}{Style.RESET_ALL}")
-        click.echo(f"  {Fore.YELLOW}Available Cash: ${available_cash:,.2f}{Style.RESET_ALL}")
-        click.echo(f"  {Fore.CYAN}Positions Value: ${positions_value:,.2f}{Style.RESET_ALL}")
+        click.secho("\nPortfolio Summary:", fg='white')
+        click.secho("  Total Portfolio Value: " + fmt_money(to_cents(portfolio_value)), fg='green')
+        click.secho("  Available Cash: " + fmt_money(to_cents(available_cash)), fg='yellow')
+        click.secho("  Positions Value: " + fmt_money(to_cents(positions_value)), fg='cyan')
 
         # Show positions
         positions = manager.get_positions()
         if positions:
-            click.echo(f"\n{Fore.WHITE}Current Positions:{Style.RESET_ALL}")
-            for symbol, data in sorted(positions.items()):
+            click.secho("\nCurrent Positions:", fg='white')
+            sorted_symbols = sorted(positions)
+            prices = manager.get_latest_prices(sorted_symbols)
+            for symbol in sorted_symbols:
+                data = positions[symbol]
                 shares = float(data.get('quantity', 0))
-                price = float(rs.stocks.get_latest_price(symbol)[0])
+                price = prices.get(symbol)
+                if price is None:
+                    click.echo("  " + click.style(symbol, fg='cyan') + f": {shares:.2f} shares " +
+                               click.style("(price unavailable)", fg='yellow'))
+                    continue
                 value = shares * price
-                click.echo(f"  {Fore.CYAN}{symbol}{Style.RESET_ALL}: {shares:.2f} shares @ ${price:.2f} = ${value:.2f}")
+                click.echo("  " + click.style(symbol, fg='cyan') + f": {shares:.2f} shares @ ${price:.2f} = ${value:.2f}")
 
     except Exception as e:
-        click.echo(f"{Fore.RED}Error: {e}{Style.RESET_ALL}")
+        click.secho(f"Error: {e}", fg='red')
     finally:
         manager.logout()
 
@@ -572,15 +1036,14 @@ def config(username, password, totp_secret):
     os.makedirs(config_dir, exist_ok=True)
 
     env_file = os.path.join(config_dir, ".env")
+    env_path = Path(env_file)
 
     # Read existing values if file exists
-    existing_values = {}
-    if os.path.exists(env_file):
-        with open(env_file, 'r') as f:
-            for line in f:
-                if '=' in line:
-                    key, value = line.strip().split('=', 1)
-                    existing_values[key] = value
+    existing_values = dict(
+        line.strip().split('=', 1)
+        for line in env_path.read_text().splitlines()
+        if '=' in line
+    ) if env_path.exists() else {}
 
     # Get credentials interactively if not provided
     if not username:
@@ -611,8 +1074,8 @@ def config(username, password, totp_secret):
     # Set permissions to be secure (readable only by owner)
     os.chmod(env_file, 0o600)
 
-    click.echo(f"{Fore.GREEN}✓ Credentials saved to {env_file}{Style.RESET_ALL}")
-    click.echo(f"{Fore.CYAN}You can now use rob from anywhere!{Style.RESET_ALL}")
+    click.secho(f"✓ Credentials saved to {env_file}", fg='green')
+    click.secho("You can now use rob from anywhere!", fg='cyan')
 
 @cli.command()
 def interactive():
@@ -622,31 +1085,32 @@ def interactive():
 
     try:
         # Header
-        print(f"\n{Fore.CYAN}{'='*60}{Style.RESET_ALL}")
-        print(f"{Fore.CYAN}         Robinhood Position Manager{Style.RESET_ALL}")
-        print(f"{Fore.CYAN}{'='*60}{Style.RESET_ALL}\n")
+        click.secho(f"\n{'='*60}", fg='cyan')
+        click.secho("         Robinhood Position Manager", fg='cyan')
+        click.secho(f"{'='*60}\n", fg='cyan')
 
         # Authenticate
         if not manager.authenticate():
             sys.exit(1)
 
         # Fetch and display portfolio summary
-        print(f"\n{Fore.CYAN}Fetching portfolio information...{Style.RESET_ALL}")
+        click.secho("\nFetching portfolio information...", fg='cyan')
         portfolio_value, available_cash, positions_value = manager.get_portfolio_summary()
 
-        print(f"\n{Fore.WHITE}Portfolio Summary:{Style.RESET_ALL}")
-        print(f"  {Fore.GREEN}Total Portfolio Value: ${portfolio_value:,.2f}{Style.RESET_ALL}")
-        print(f"  {Fore.YELLOW}Available Cash: ${available_cash:,.2f}{Style.RESET_ALL}")
-        print(f"  {Fore.CYAN}Positions Value: ${positions_value:,.2f}{Style.RESET_ALL}")
+        click.secho("\nPortfolio Summary:", fg='white')
+        click.secho("  Total Portfolio Value: " + fmt_money(to_cents(portfolio_value)), fg='green')
+        click.secho("  Available Cash: " + fmt_money(to_cents(available_cash)), fg='yellow')
+        click.secho("  Positions Value: " + fmt_money(to_cents(positions_value)), fg='cyan')
 
         # Get action from user
-        print(f"\n{Fore.WHITE}What would you like to do?{Style.RESET_ALL}")
-        print(f"  1) Increase positions")
-        print(f"  2) Decrease positions")
-        print(f"  3) Exit")
+        click.secho("\nWhat would you like to do?", fg='white')
+        click.echo("  1) Increase positions")
+        click.echo("  2) Decrease positions")
+        click.echo("  3) Exit")
 
         while True:
-            choice = input(f"\n{Fore.YELLOW}Enter your choice (1-3): {Style.RESET_ALL}").strip()
+            click.echo(PROMPT_CHOICE, nl=False)
+            choice = read_choice('123')
             if choice == '1':
                 action = 'increase'
                 break
@@ -654,58 +1118,48 @@ def interactive():
                 action = 'decrease'
                 break
             elif choice == '3':
-                print(f"\n{Fore.YELLOW}Exiting...{Style.RESET_ALL}")
+                click.secho("\nExiting...", fg='yellow')
                 return
             else:
-                print(f"{Fore.RED}Invalid choice. Please enter 1, 2, or 3.{Style.RESET_ALL}")
+                click.echo(ERR_INVALID_CHOICE)
 
         # Get percentage from user
+        prompt_pct = PROMPT_PCT.format(action=action)
         while True:
             try:
-                percentage = float(input(f"\n{Fore.YELLOW}Enter the percentage to {action} positions by: {Style.RESET_ALL}"))
+                percentage = parse_pct(prompt_input(prompt_pct))
                 if percentage <= 0 or percentage > 100:
-                    print(f"{Fore.RED}Please enter a percentage between 0 and 100{Style.RESET_ALL}")
+                    click.echo(ERR_PCT_RANGE)
                     continue
                 break
             except ValueError:
-                print(f"{Fore.RED}Please enter a valid number{Style.RESET_ALL}")
+                click.echo(ERR_BAD_NUMBER)
 
         # Calculate and display expected cost
-        print(f"\n{Fore.CYAN}Calculating expected cost...{Style.RESET_ALL}")
-        expected_cost = manager.calculate_total_expected_cost(action, percentage)
-
-        print(f"\n{Fore.WHITE}Operation Summary:{Style.RESET_ALL}")
-        print(f"  Action: {Fore.CYAN}{action.upper()}{Style.RESET_ALL} positions by {Fore.YELLOW}{percentage}%{Style.RESET_ALL}")
+        click.secho("\nCalculating expected cost...", fg='cyan')
+        positions = manager.get_positions()
+        plan = manager.plan_trades(positions, action, percentage)
+        expected_cost = manager.calculate_total_expected_cost(action, percentage, plan=plan)
 
-        if action == 'increase':
-            print(f"  Expected Total Cost: {Fore.RED}${expected_cost:,.2f}{Style.RESET_ALL}")
-            print(f"  Available Cash: {Fore.GREEN}${available_cash:,.2f}{Style.RESET_ALL}")
-
-            # Check if user has enough cash
-            if expected_cost > available_cash:
-                print(f"\n{Fore.RED}❌ ERROR: Insufficient funds!{Style.RESET_ALL}")
-                print(f"{Fore.RED}You need ${expected_cost:,.2f} but only have ${available_cash:,.2f} available.{Style.RESET_ALL}")
-                print(f"{Fore.YELLOW}Try a smaller percentage or sell some positions first.{Style.RESET_ALL}")
-                return
-            else:
-                print(f"  Remaining Cash After: {Fore.GREEN}${available_cash - expected_cost:,.2f}{Style.RESET_ALL}")
-        else:
-            print(f"  Expected Proceeds: {Fore.GREEN}${expected_cost:,.2f}{Style.RESET_ALL}")
-            print(f"  Cash After Selling: {Fore.GREEN}${available_cash + expected_cost:,.2f}{Style.RESET_ALL}")
+        summary, affordable = _format_operation_summary(action, percentage, expected_cost, available_cash)
+        click.echo(summary, nl=False)
+        if not affordable:
+            return
 
         # Confirm before proceeding
-        confirm = input(f"\n{Fore.YELLOW}Proceed with {action}ing positions? (yes/no): {Style.RESET_ALL}").strip().lower()
+        confirm = prompt_input(PROMPT_CONFIRM.format(action=action)).strip().lower()
         if confirm not in ['yes', 'y']:
-            print(f"\n{Fore.YELLOW}Operation cancelled.{Style.RESET_ALL}")
+            click.secho("\nOperation cancelled.", fg='yellow')
             return
 
         # Process positions
-        manager.process_positions(action, percentage, dry_run=False, auto_confirm=False)
+        manager.process_positions(action, percentage, dry_run=False, auto_confirm=False,
+                                  positions=positions, plan=plan)
 
     except KeyboardInterrupt:
-        print(f"\n\n{Fore.YELLOW}Interrupted by user{Style.RESET_ALL}")
+        click.secho("\n\nInterrupted by user", fg='yellow')
     except Exception as e:
-        print(f"\n{Fore.RED}Unexpected error: {e}{Style.RESET_ALL}")
+        click.secho(f"\nUnexpected error: {e}", fg='red')
     finally:
         manager.logout()
 
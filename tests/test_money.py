@@ -0,0 +1,17 @@
+import random
+import unittest
+
+from rob import fmt_money, to_cents
+
+
+class FmtMoneyTest(unittest.TestCase):
+    def test_matches_format_spec(self):
+        rng = random.Random(0)
+        amounts = [0, 0.005, 0.015, 999.995, 1000, 7583.465, 1234567.891, -1234.5]
+        amounts += [round(rng.uniform(-100000, 100000), 3) for _ in range(10000)]
+        for amount in amounts:
+            self.assertEqual(fmt_money(to_cents(amount)), f"${amount:,.2f}", amount)
+
+
+if __name__ == '__main__':
+    unittest.main()